@@ -1,119 +1,136 @@
-import os
-import textwrap
+import io
 import json
+import os
+import sys
+import time
+from collections import namedtuple
 
-def create_file(path, content):
-    """创建文件并写入内容，如果父目录不存在则创建父目录"""
-    dir_name = os.path.dirname(path)
-    if dir_name and not os.path.exists(dir_name):
-        os.makedirs(dir_name)
-    
-    with open(path, 'w', encoding='utf-8') as f:
-        f.write(content.strip() + "\n")
-    print(f"Created: {path}")
+# --- 多语言 String Catalog (Localizable.xcstrings) ---
+# 这是一个标准的 JSON 格式，Xcode 会自动识别并提供可视化编辑器。
+# 内容是常量，在模块加载时直接序列化为最终写入的 UTF-8 字节。
+# (英文 key, 简体中文翻译, 注释)
+_STRINGS = (
+    ("Settings", "设置", None),
+    ("Quit", "退出", None),
+    ("General", "通用", None),
+    ("Shortcuts", "快捷键", None),
+    ("Pro", "专业版", None),
+    ("Unlock Pro", "解锁专业版", None),
+    ("NEW", "新", "Badge label for new features"),
+    ("Toggle Window Switcher", "切换窗口切换器", "App Intent title"),
+    ("Launch at Login", "开机自启", None),
+    ("Restore Purchases", "恢复购买", None),
+)
+
+def _zh(value, comment=None):
+    """构造一条只有简体中文翻译的 String Catalog 条目"""
+    entry = {"comment" : comment} if comment else {}
+    entry["localizations"] = {
+        "zh-Hans" : { "stringUnit" : { "state" : "translated", "value" : value } }
+    }
+    return entry
+
+_XCSTRINGS_DICT = {
+    "sourceLanguage" : "en",
+    "strings" : {en: _zh(zh, comment) for en, zh, comment in _STRINGS},
+    "version" : "1.0"
+}
+
+_XCSTRINGS_BYTES = (json.dumps(_XCSTRINGS_DICT, indent=2, ensure_ascii=False) + "\n").encode("utf-8")
+
+# 一个待生成的文件。is_raw 为 True 时 payload 即最终字节，不需要 Swift header；
+# 否则 payload 为 Swift 正文（str），由 render_job 拼上文件头后编码
+Job = namedtuple("Job", "path filename imports intent payload is_raw")
+
+# 渲染完成、可直接写盘的文件：data 为最终 UTF-8 字节
+RenderedFile = namedtuple("RenderedFile", "path data")
+
+def create_file(path, data):
+    """将已规范化、编码好的最终字节按原样写入文件，父目录需已存在。
+
+    绕过 Python 的缓冲 IO 层，直接以 open/write/close 三个系统调用完成写入。
+    """
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+def _is_up_to_date(path, data):
+    """磁盘上的文件是否已与将要写入的字节完全一致；文件不存在或无法读取时视为需要写入"""
+    try:
+        if os.stat(path).st_size != len(data):
+            return False
+        with open(path, 'rb') as f:
+            return f.read() == data
+    except OSError:
+        return False
+
+def _write_tar(tar_path, files):
+    """将所有 RenderedFile 写入一个 tar 归档"""
+    import tarfile  # 只有 --tar 才用到，按需导入以减少启动开销
+
+    mtime = time.time()
+    with tarfile.open(tar_path, "w") as tar:
+        for f in files:
+            info = tarfile.TarInfo(f.path)
+            info.size = len(f.data)
+            info.mode = 0o644
+            info.mtime = mtime
+            tar.addfile(info, io.BytesIO(f.data))
+
+# Swift 文件头模板：直接写成无缩进的字面量，无需在运行时 dedent
+_HEADER_TMPL = """//
+//  {filename}
+//  DockSens
+//
+//  Created by DockSens Setup Script.
+//
+
+{imports}
+
+// TODO: {intent}
+// ---------------------------------------------------------
+
+"""
 
 def generate_header(filename, imports, intent):
     """生成 Swift 文件头、Import 语句和 TODO 注释"""
-    import_stmts = "\n".join([f"import {lib}" for lib in imports])
-    
-    return textwrap.dedent(f"""
-        //
-        //  {filename}
-        //  DockSens
-        //
-        //  Created by DockSens Setup Script.
-        //
-
-        {import_stmts}
-
-        // TODO: {intent}
-        // ---------------------------------------------------------
-        
-        """)
+    import_stmts = "\n".join(f"import {lib}" for lib in imports)
+    return _HEADER_TMPL.format(filename=filename, imports=import_stmts, intent=intent)
 
-def main():
-    root_dir = "DockSens_Project_Structure"
-    
-    # --- 1. 定义多语言 String Catalog (Localizable.xcstrings) ---
-    # 这是一个标准的 JSON 格式，Xcode 会自动识别并提供可视化编辑器。
-    xcstrings_content = json.dumps({
-        "sourceLanguage" : "en",
-        "strings" : {
-            "Settings" : {
-                "localizations" : {
-                    "zh-Hans" : { "stringUnit" : { "state" : "translated", "value" : "设置" } }
-                }
-            },
-            "Quit" : {
-                "localizations" : {
-                    "zh-Hans" : { "stringUnit" : { "state" : "translated", "value" : "退出" } }
-                }
-            },
-            "General" : {
-                "localizations" : {
-                    "zh-Hans" : { "stringUnit" : { "state" : "translated", "value" : "通用" } }
-                }
-            },
-            "Shortcuts" : {
-                "localizations" : {
-                    "zh-Hans" : { "stringUnit" : { "state" : "translated", "value" : "快捷键" } }
-                }
-            },
-            "Pro" : {
-                "localizations" : {
-                    "zh-Hans" : { "stringUnit" : { "state" : "translated", "value" : "专业版" } }
-                }
-            },
-            "Unlock Pro" : {
-                "localizations" : {
-                    "zh-Hans" : { "stringUnit" : { "state" : "translated", "value" : "解锁专业版" } }
-                }
-            },
-            "NEW" : {
-                "comment" : "Badge label for new features",
-                "localizations" : {
-                    "zh-Hans" : { "stringUnit" : { "state" : "translated", "value" : "新" } }
-                }
-            },
-            "Toggle Window Switcher" : {
-                "comment" : "App Intent title",
-                "localizations" : {
-                    "zh-Hans" : { "stringUnit" : { "state" : "translated", "value" : "切换窗口切换器" } }
-                }
-            },
-            "Launch at Login" : {
-                "localizations" : {
-                    "zh-Hans" : { "stringUnit" : { "state" : "translated", "value" : "开机自启" } }
-                }
-            },
-            "Restore Purchases" : {
-                "localizations" : {
-                    "zh-Hans" : { "stringUnit" : { "state" : "translated", "value" : "恢复购买" } }
-                }
-            }
-        },
-        "version" : "1.0"
-    }, indent=2, ensure_ascii=False)
-
-    files_config = {
-        # ==========================================
-        # 0. Resources (新增)
-        # ==========================================
-        f"{root_dir}/Resources/Localizable.xcstrings": (
-            "Localizable.xcstrings",
-            [], 
-            "多语言字符串目录 (String Catalog)。支持英语(开发语言)和简体中文。",
-            xcstrings_content # 这是一个特殊的处理，不需要 generate_header
-        ),
-
-        # ==========================================
-        # 1. App & 全局状态
-        # ==========================================
-        f"{root_dir}/App/DockSensApp.swift": (
-            "DockSensApp.swift",
-            ["SwiftUI", "AppIntents"], 
-            "App 入口。注入全局 AppState。",
-            """
+def render_job(job):
+    """将 Job 渲染为最终写入的 UTF-8 字节"""
+    if job.is_raw:
+        return job.payload
+    body = job.payload or f"// 代码实现...\n// class {job.filename.split('.')[0]} {{ }}"
+    # 一次性完成首尾空白规范化和编码
+    return ((generate_header(job.filename, job.imports, job.intent) + body).strip() + "\n").encode("utf-8")
+
+_ROOT_DIR = "DockSens_Project_Structure"
+
+# 生成文件清单：路径 -> (文件名, imports, 意图说明, 文件内容)。内容是静态的，模块加载时构建一次
+_FILES_CONFIG = {
+    # ==========================================
+    # 0. Resources (新增)
+    # ==========================================
+    f"{_ROOT_DIR}/Resources/Localizable.xcstrings": (
+        "Localizable.xcstrings",
+        [], 
+        "多语言字符串目录 (String Catalog)。支持英语(开发语言)和简体中文。",
+        _XCSTRINGS_BYTES # 这是一个特殊的处理，不需要 generate_header
+    ),
+
+    # ==========================================
+    # 1. App & 全局状态
+    # ==========================================
+    f"{_ROOT_DIR}/App/DockSensApp.swift": (
+        "DockSensApp.swift",
+        ["SwiftUI", "AppIntents"], 
+        "App 入口。注入全局 AppState。",
+        """
 @main
 struct DockSensApp: App {
     @State private var appState = AppState()
@@ -136,13 +153,13 @@ struct DockSensApp: App {
         }
     }
 }
-            """
-        ),
-        f"{root_dir}/Core/State/AppState.swift": (
-            "AppState.swift",
-            ["SwiftUI", "Observation"],
-            "全局单一事实来源。整合 WindowManager 和 StoreService 的状态。",
-            """
+        """
+    ),
+    f"{_ROOT_DIR}/Core/State/AppState.swift": (
+        "AppState.swift",
+        ["SwiftUI", "Observation"],
+        "全局单一事实来源。整合 WindowManager 和 StoreService 的状态。",
+        """
 @MainActor
 @Observable
 final class AppState {
@@ -182,17 +199,17 @@ final class AppState {
         isSwitcherVisible = true
     }
 }
-            """
-        ),
-
-        # ==========================================
-        # 2. Core - 核心逻辑
-        # ==========================================
-        f"{root_dir}/Core/WindowManager/WindowManager.swift": (
-            "WindowManager.swift",
-            ["AppKit", "Foundation"],
-            "主线程窗口控制器。管理 NSPanel 实例的生命周期。",
-            """
+        """
+    ),
+
+    # ==========================================
+    # 2. Core - 核心逻辑
+    # ==========================================
+    f"{_ROOT_DIR}/Core/WindowManager/WindowManager.swift": (
+        "WindowManager.swift",
+        ["AppKit", "Foundation"],
+        "主线程窗口控制器。管理 NSPanel 实例的生命周期。",
+        """
 @MainActor
 class WindowManager {
     private var switcherPanel: NSPanel?
@@ -205,13 +222,13 @@ class WindowManager {
         return AsyncStream { _ in }
     }
 }
-            """
-        ),
-        f"{root_dir}/Core/WindowManager/WindowEngine.swift": (
-            "WindowEngine.swift",
-            ["ApplicationServices", "CoreGraphics"],
-            "后台 Actor。负责繁重的 AXUIElement 查询。",
-            """
+        """
+    ),
+    f"{_ROOT_DIR}/Core/WindowManager/WindowEngine.swift": (
+        "WindowEngine.swift",
+        ["ApplicationServices", "CoreGraphics"],
+        "后台 Actor。负责繁重的 AXUIElement 查询。",
+        """
 struct WindowInfo: Identifiable, Sendable {
     let id: Int
     let title: String
@@ -224,13 +241,13 @@ actor WindowEngine {
         return []
     }
 }
-            """
-        ),
-        f"{root_dir}/Core/Store/StoreService.swift": (
-            "StoreService.swift",
-            ["StoreKit", "Foundation"],
-            "内购逻辑服务。",
-            """
+        """
+    ),
+    f"{_ROOT_DIR}/Core/Store/StoreService.swift": (
+        "StoreService.swift",
+        ["StoreKit", "Foundation"],
+        "内购逻辑服务。",
+        """
 actor StoreService {
     private let proProductID = "com.docksens.pro.lifetime"
 
@@ -256,13 +273,13 @@ actor StoreService {
         continuation.yield(hasPro)
     }
 }
-            """
-        ),
-        f"{root_dir}/Core/Shortcuts/GlobalShortcuts.swift": (
-            "GlobalShortcuts.swift",
-            ["AppKit", "AppIntents"],
-            "定义全局热键名称和 App Intents。",
-            """
+        """
+    ),
+    f"{_ROOT_DIR}/Core/Shortcuts/GlobalShortcuts.swift": (
+        "GlobalShortcuts.swift",
+        ["AppKit", "AppIntents"],
+        "定义全局热键名称和 App Intents。",
+        """
 // import KeyboardShortcuts
 
 struct ToggleSwitcherIntent: AppIntent {
@@ -277,17 +294,17 @@ struct ToggleSwitcherIntent: AppIntent {
         return .result()
     }
 }
-            """
-        ),
-
-        # ==========================================
-        # 3. UI - 界面层
-        # ==========================================
-        f"{root_dir}/UI/Store/StoreView.swift": (
-            "StoreView.swift",
-            ["SwiftUI", "StoreKit"],
-            "内购界面。",
-            """
+        """
+    ),
+
+    # ==========================================
+    # 3. UI - 界面层
+    # ==========================================
+    f"{_ROOT_DIR}/UI/Store/StoreView.swift": (
+        "StoreView.swift",
+        ["SwiftUI", "StoreKit"],
+        "内购界面。",
+        """
 struct ProStoreView: View {
     var body: some View {
         SubscriptionStoreView(groupID: "group.com.docksens.pro") {
@@ -302,13 +319,13 @@ struct ProStoreView: View {
         .storeButton(.visible, for: .restorePurchases)
     }
 }
-            """
-        ),
-        f"{root_dir}/UI/Settings/SettingsView.swift": (
-            "SettingsView.swift",
-            ["SwiftUI"],
-            "设置窗口。",
-            """
+        """
+    ),
+    f"{_ROOT_DIR}/UI/Settings/SettingsView.swift": (
+        "SettingsView.swift",
+        ["SwiftUI"],
+        "设置窗口。",
+        """
 struct SettingsView: View {
     @Environment(AppState.self) var appState
     
@@ -330,13 +347,13 @@ struct SettingsView: View {
         .frame(minWidth: 500, minHeight: 400)
     }
 }
-            """
-        ),
-        f"{root_dir}/UI/Settings/GeneralSettingsView.swift": (
-            "GeneralSettingsView.swift",
-            ["SwiftUI"],
-            "通用设置。",
-            """
+        """
+    ),
+    f"{_ROOT_DIR}/UI/Settings/GeneralSettingsView.swift": (
+        "GeneralSettingsView.swift",
+        ["SwiftUI"],
+        "通用设置。",
+        """
 struct GeneralSettingsView: View {
     // 这是一个简单的占位符，展示如何使用 Localized Key
     @AppStorage("launchAtLogin") var launchAtLogin = false
@@ -349,39 +366,95 @@ struct GeneralSettingsView: View {
         .padding()
     }
 }
-            """
-        ),
-
-        # ==========================================
-        # 4. Utilities
-        # ==========================================
-        f"{root_dir}/Utilities/Permissions.swift": (
-            "Permissions.swift",
-            ["AppKit"],
-            "权限检查工具。",
-            "enum Permissions { static func isAccessibilityTrusted() -> Bool { AXIsProcessTrusted() } }"
-        ),
-    }
+        """
+    ),
 
-    print(f"🚀 开始生成 DockSens (macOS 15+ Modern Arch, with Localization) 项目结构...")
+    # ==========================================
+    # 4. Utilities
+    # ==========================================
+    f"{_ROOT_DIR}/Utilities/Permissions.swift": (
+        "Permissions.swift",
+        ["AppKit"],
+        "权限检查工具。",
+        "enum Permissions { static func isAccessibilityTrusted() -> Bool { AXIsProcessTrusted() } }"
+    ),
+}
+
+_USAGE = """usage: setup_project.py [-h] [--tar]
+
+生成 DockSens 项目结构。
 
-    for path, (filename, imports, intent, content_or_tuple) in files_config.items():
-        if filename.endswith(".xcstrings"):
-            # 特殊处理 .xcstrings，它不需要 Swift header
-            create_file(path, content_or_tuple)
+options:
+  -h, --help  显示帮助信息并退出
+  --tar       将所有文件打包为单个 DockSens_Project_Structure.tar，而不是逐个写入磁盘（使用前需先解压）
+"""
+
+def _parse_args(argv=None):
+    """解析命令行，返回是否使用 --tar。只有一个开关，无需引入 argparse 的启动开销"""
+    tar = False
+    for arg in sys.argv[1:] if argv is None else argv:
+        if arg in ("-h", "--help"):
+            sys.stdout.write(_USAGE)
+            sys.exit(0)
+        elif arg == "--tar":
+            tar = True
         else:
-            file_content = generate_header(filename, imports, intent)
-            if content_or_tuple:
-                file_content += content_or_tuple
-            else:
-                file_content += f"// 代码实现...\n// class {filename.split('.')[0]} {{ }}"
-            create_file(path, file_content)
+            sys.stderr.write(_USAGE.split("\n", 1)[0] + f"\nsetup_project.py: error: unrecognized arguments: {arg}\n")
+            sys.exit(2)
+    return tar
+
+def main(argv=None):
+    use_tar = _parse_args(argv)
+    root_dir = _ROOT_DIR
+
+    print(f"🚀 开始生成 DockSens (macOS 15+ Modern Arch, with Localization) 项目结构...")
+
+    # 特殊处理 .xcstrings，它不需要 Swift header；是否为原样内容在建表时判断一次
+    jobs = [
+        Job(path, filename, tuple(imports), intent, content, filename.endswith(".xcstrings"))
+        for path, (filename, imports, intent, content) in _FILES_CONFIG.items()
+    ]
+
+    # 先在内存中把所有文件渲染为最终字节，再统一写盘
+    files = [RenderedFile(job.path, render_job(job)) for job in jobs]
+
+    if use_tar:
+        # 打包为单个 tar 文件：所有内容写入同一个已打开的 fd，避免逐个创建小文件
+        tar_path = f"{root_dir}.tar"
+        _write_tar(tar_path, files)
+        print(f"Created: {tar_path}（共 {len(files)} 个文件，解压后使用）")
+    else:
+        # 预先创建所有父目录：同一目录只创建一次，排序保证父目录先于子目录
+        for dir_name in sorted({os.path.dirname(p) for p in _FILES_CONFIG if os.path.dirname(p)}):
+            os.makedirs(dir_name, exist_ok=True)
+
+        # 磁盘上内容已完全一致的文件跳过写入，避免触发 Xcode 重新索引；
+        # 被手动修改或损坏的文件仍会被重新生成
+        pending = [f for f in files if not _is_up_to_date(f.path, f.data)]
+        skipped = len(files) - len(pending)
+
+        # 按父目录排序，同一目录下的文件连续写入
+        pending.sort(key=lambda f: os.path.dirname(f.path))
+        for f in pending:
+            create_file(f.path, f.data)
+        # 汇总后一次性输出，而不是每个文件一次 print
+        if pending:
+            sys.stdout.write("Created files:\n  " + "\n  ".join(f.path for f in pending) + "\n")
+        if skipped:
+            print(f"Unchanged: {skipped} 个文件内容未变化，已跳过。")
 
     print(f"\n✅ 升级完毕！包含多语言资源。")
     print("👉 操作指南：")
-    print("1. 将 'Resources' 文件夹拖入 Xcode 项目。")
-    print("2. Xcode 会自动识别 Localizable.xcstrings。")
-    print("3. 运行 App 时，如果系统语言是中文，你会看到界面已自动汉化。")
+    steps = [
+        "将 'Resources' 文件夹拖入 Xcode 项目。",
+        "Xcode 会自动识别 Localizable.xcstrings。",
+        "运行 App 时，如果系统语言是中文，你会看到界面已自动汉化。",
+    ]
+    if use_tar:
+        # tar 模式下磁盘上还没有任何文件夹，需要先解压
+        steps.insert(0, f"先运行 `tar xf {root_dir}.tar` 解压出 '{root_dir}' 文件夹。")
+    for i, step in enumerate(steps, 1):
+        print(f"{i}. {step}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file